@@ -175,7 +175,7 @@ View ticket: https://adgear.atlassian.net/browse/{ticket_key}
 
         logger.info("🚀 Starting Enhanced Pixel Ticket Notification Monitor")
         logger.info(f"Check interval: {NOTIFICATION_CONFIG['check_interval']} seconds")
-        logger.info(f"Lookback period: {NOTIFICATION_CONFIG['lookback_hours']} hours")
+        logger.info(f"Lookback period: {NOTIFICATION_CONFIG['lookback_minutes']} minutes")
         logger.info(f"Interactive feedback: {'enabled' if interactive else 'disabled'}")
         logger.info(f"Learning system: enabled 🧠")
 
@@ -208,7 +208,7 @@ View ticket: https://adgear.atlassian.net/browse/{ticket_key}
 
         # Calculate time window
         now = datetime.now()
-        cutoff_time = now - timedelta(hours=NOTIFICATION_CONFIG['lookback_hours'])
+        cutoff_time = now - timedelta(minutes=NOTIFICATION_CONFIG['lookback_minutes'])
         jql_time = cutoff_time.strftime('%Y-%m-%d %H:%M')
 
         logger.info(f"Searching for tickets created after: {jql_time}")
@@ -4,13 +4,26 @@ Focused Jira Pixel Research Script
 Specifically searches for web pixel and tracking implementation tickets.
 """
 
+import argparse
 import requests
 import base64
+import html
 import json
 import os
+import re
+import sys
 from datetime import datetime, timedelta
 from collections import Counter, defaultdict
 
+try:
+    import orjson  # Optional: faster search decoding and --cache reads/writes
+except ImportError:
+    orjson = None
+
+# Shared helpers live in core/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+from keyword_scanner import build_keyword_scanner, scan_keywords
+
 # Jira Configuration
 JIRA_CONFIG = {
     'base_url': 'https://adgear.atlassian.net',
@@ -19,6 +32,12 @@ JIRA_CONFIG = {
     'project_key': 'PS'
 }
 
+# Only the fields read by analyze_focused_pixel_tickets
+FOCUSED_FIELDS = ['summary', 'description', 'priority', 'status', 'issuetype', 'created']
+
+# Strips tags from Jira's server-rendered (HTML) field values
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
 def make_jira_request(endpoint, method='GET', data=None):
     """Make authenticated request to Jira API"""
     auth_string = f"{JIRA_CONFIG['email']}:{JIRA_CONFIG['token']}"
@@ -39,14 +58,16 @@ def make_jira_request(endpoint, method='GET', data=None):
             response = requests.get(url, headers=headers, timeout=30)
 
         response.raise_for_status()
+        if orjson is not None:
+            return orjson.loads(response.content)
         return response.json()
 
     except requests.exceptions.RequestException as e:
         print(f"Jira API request failed: {e}")
         raise
 
-def search_issues(jql, fields=None, max_results=100):
-    """Search Jira issues using JQL"""
+def search_issues(jql, fields=None, max_results=100, expand='renderedFields', next_page_token=None):
+    """Search Jira issues using JQL (one page; pass nextPageToken for the next)"""
     if fields is None:
         fields = ['key', 'summary', 'description', 'status', 'priority', 'created',
                  'updated', 'labels', 'issuetype', 'assignee', 'reporter']
@@ -56,6 +77,11 @@ def search_issues(jql, fields=None, max_results=100):
         'fields': fields,
         'maxResults': max_results
     }
+    if expand:
+        # renderedFields lets Jira convert ADF descriptions to HTML server-side
+        data['expand'] = expand
+    if next_page_token:
+        data['nextPageToken'] = next_page_token
 
     return make_jira_request('/rest/api/3/search/jql', method='POST', data=data)
 
@@ -80,173 +106,237 @@ def extract_text_from_adf(adf_content):
     extract_recursive(adf_content)
     return ' '.join(text_parts)
 
-def analyze_focused_pixel_tickets():
-    """Focused analysis on specific pixel-related searches"""
-    print("=" * 80)
-    print("FOCUSED JIRA PIXEL RESEARCH - PS PROJECT")
-    print("=" * 80)
-    print()
+def get_description_text(issue):
+    """Get plain-text description, preferring Jira's rendered HTML over ADF"""
+    rendered = (issue.get('renderedFields') or {}).get('description')
+    if rendered:
+        return html.unescape(HTML_TAG_RE.sub(' ', rendered))
+
+    # Fall back to walking the ADF tree client-side
+    description = issue['fields'].get('description', '')
+    if description and isinstance(description, dict):
+        return extract_text_from_adf(description)
+    return str(description) if description else ''
+
+# Focused searches. 'terms' mirrors each JQL clause client-side as groups of
+# (field, words) that must all match; 'text' means summary or description.
+FOCUSED_SEARCHES = [
+    {
+        'name': 'Pixel-specific tickets',
+        'jql': "summary ~ 'pixel' OR description ~ 'pixel'",
+        'terms': [('text', ('pixel',))]
+    },
+    {
+        'name': 'Tracking implementation tickets',
+        'jql': "(summary ~ 'tracking' OR description ~ 'tracking') AND (summary ~ 'implement' OR description ~ 'implement' OR summary ~ 'code' OR description ~ 'code')",
+        'terms': [('text', ('tracking',)), ('text', ('implement', 'code'))]
+    },
+    {
+        'name': 'Tag/Script implementation tickets',
+        'jql': "(summary ~ 'tag' OR summary ~ 'script') AND (summary ~ 'implement' OR summary ~ 'install' OR summary ~ 'setup')",
+        'terms': [('summary', ('tag', 'script')), ('summary', ('implement', 'install', 'setup'))]
+    },
+    {
+        'name': 'Web/JavaScript tickets',
+        'jql': "(summary ~ 'javascript' OR summary ~ 'js' OR summary ~ 'web') AND (summary ~ 'code' OR summary ~ 'snippet' OR summary ~ 'integration')",
+        'terms': [('summary', ('javascript', 'js', 'web')), ('summary', ('code', 'snippet', 'integration'))]
+    }
+]
 
-    six_months_ago = (datetime.now() - timedelta(days=180)).strftime('%Y-%m-%d')
+SEARCH_SCANNER = build_keyword_scanner(
+    [word for search in FOCUSED_SEARCHES for _, words in search['terms'] for word in words]
+)
+
+def match_focused_searches(summary, description_text):
+    """Return the names of the focused searches a ticket matches"""
+    found = {'summary': scan_keywords(SEARCH_SCANNER, summary)}
+    found['text'] = found['summary'] | scan_keywords(SEARCH_SCANNER, description_text)
 
-    # Multiple focused searches
-    search_queries = [
-        {
-            'name': 'Pixel-specific tickets',
-            'jql': f"project={JIRA_CONFIG['project_key']} AND created >= '{six_months_ago}' AND (summary ~ 'pixel' OR description ~ 'pixel')"
-        },
-        {
-            'name': 'Tracking implementation tickets',
-            'jql': f"project={JIRA_CONFIG['project_key']} AND created >= '{six_months_ago}' AND (summary ~ 'tracking' OR description ~ 'tracking') AND (summary ~ 'implement' OR description ~ 'implement' OR summary ~ 'code' OR description ~ 'code')"
-        },
-        {
-            'name': 'Tag/Script implementation tickets',
-            'jql': f"project={JIRA_CONFIG['project_key']} AND created >= '{six_months_ago}' AND (summary ~ 'tag' OR summary ~ 'script') AND (summary ~ 'implement' OR summary ~ 'install' OR summary ~ 'setup')"
-        },
-        {
-            'name': 'Web/JavaScript tickets',
-            'jql': f"project={JIRA_CONFIG['project_key']} AND created >= '{six_months_ago}' AND (summary ~ 'javascript' OR summary ~ 'js' OR summary ~ 'web') AND (summary ~ 'code' OR summary ~ 'snippet' OR summary ~ 'integration')"
-        }
+    return [
+        search['name'] for search in FOCUSED_SEARCHES
+        if all(not found[field].isdisjoint(words) for field, words in search['terms'])
     ]
 
-    all_tickets = {}
+def fetch_tickets():
+    """Fetch focused pixel tickets as flat dicts tagged with the searches they match
+
+    Returns None if the search fails.
+    """
+    six_months_ago = (datetime.now() - timedelta(days=180)).strftime('%Y-%m-%d')
+
+    # One union query replaces the four overlapping searches; each ticket is
+    # then tagged client-side with the searches it would have matched
+    search_clauses = ' OR '.join(f"({search['jql']})" for search in FOCUSED_SEARCHES)
+    combined_jql = f"project={JIRA_CONFIG['project_key']} AND created >= '{six_months_ago}' AND ({search_clauses})"
+
+    print(f"Combined JQL: {combined_jql}")
+
+    # Follow the nextPageToken cursor until Jira reports the last page
+    issues = []
+    next_page_token = None
+    try:
+        while True:
+            result = search_issues(combined_jql, fields=FOCUSED_FIELDS, max_results=100,
+                                   next_page_token=next_page_token)
+            issues.extend(result.get('issues', []))
+
+            next_page_token = result.get('nextPageToken')
+            if result.get('isLast', True) or not next_page_token:
+                break
+    except Exception as e:
+        print(f"Error in search: {e}")
+        return None
+
+    tickets = []
+    for issue in issues:
+        fields = issue['fields']
+        summary = fields.get('summary', '')
+        priority = fields.get('priority', {})
+        status = fields.get('status', {})
+        issue_type = fields.get('issuetype', {})
+
+        # The description is converted to text once, here
+        description = get_description_text(issue)
+
+        tickets.append({
+            'key': issue['key'],
+            'summary': summary,
+            'priority': priority.get('name', 'None') if priority else 'None',
+            'status': status.get('name', 'Unknown') if status else 'Unknown',
+            'issuetype': issue_type.get('name', 'Unknown') if issue_type else 'Unknown',
+            'created': fields.get('created', ''),
+            'description': description,
+            'searches': match_focused_searches(summary, description)
+        })
+
+    return tickets
+
+# Ticket cache layout: a {"keys": [...]} header line, then one JSON array per
+# ticket in the same order, so field names are stored once rather than per row
+CACHE_KEYS = ['key', 'summary', 'priority', 'status', 'issuetype', 'created', 'description', 'searches']
+
+def save_tickets(tickets, path):
+    """Save fetched tickets as JSON Lines so reruns can skip the Jira calls"""
+    dumps = orjson.dumps if orjson is not None else (lambda obj: json.dumps(obj).encode())
+    with open(path, 'wb') as f:
+        f.write(dumps({'keys': CACHE_KEYS}) + b'\n')
+        for ticket in tickets:
+            f.write(dumps([ticket[key] for key in CACHE_KEYS]) + b'\n')
+
+def load_tickets(path):
+    """Load tickets saved by save_tickets"""
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(path, 'rb') as f:
+        keys = loads(f.readline())['keys']
+        return [dict(zip(keys, loads(line))) for line in f if line.strip()]
+
+def analyze_tickets(tickets):
+    """Aggregate distributions and relevance rows for the report in a single pass"""
+    priority_counts = Counter()
+    status_counts = Counter()
+    issue_type_counts = Counter()
+
+    # Common words in summaries
+    summary_words = Counter()
+
+    # Per-ticket values, counted in one Counter.update each after the loop
+    priority_names = []
+    status_names = []
+    issue_type_names = []
+
+    # Rows for the multi-search and full listing sections
+    analysis_rows = sorted(tickets, key=lambda ticket: ticket['key'])
+    multi_rows = []
+
+    for ticket in analysis_rows:
+        priority_names.append(ticket['priority'])
+        status_names.append(ticket['status'])
+        issue_type_names.append(ticket['issuetype'])
+
+        # Extract words from summary
+        summary_words.update(word for word in ticket['summary'].lower().split() if len(word) > 3)  # Only meaningful words
+
+        if len(ticket['searches']) > 1:
+            multi_rows.append(ticket)
+
+    priority_counts.update(priority_names)
+    status_counts.update(status_names)
+    issue_type_counts.update(issue_type_names)
+    multi_rows.sort(key=lambda ticket: len(ticket['searches']), reverse=True)
+
+    return {
+        'priority_counts': priority_counts,
+        'status_counts': status_counts,
+        'issue_type_counts': issue_type_counts,
+        'summary_words': summary_words,
+        'analysis_rows': analysis_rows,
+        'multi_rows': multi_rows
+    }
+
+def print_report(tickets, stats):
+    """Print the focused research report for analyzed tickets"""
+    for search in FOCUSED_SEARCHES:
+        matches = [ticket for ticket in tickets if search['name'] in ticket['searches']]
 
-    for search in search_queries:
         print(f"\n{'='*80}")
         print(f"Search: {search['name']}")
         print(f"JQL: {search['jql']}")
         print(f"{'='*80}")
+        print(f"Found {len(matches)} tickets")
 
-        try:
-            result = search_issues(search['jql'], max_results=50)
-            tickets = result.get('issues', [])
-            print(f"Found {len(tickets)} tickets")
-
-            # Store tickets with deduplication
-            for ticket in tickets:
-                ticket_key = ticket['key']
-                if ticket_key not in all_tickets:
-                    all_tickets[ticket_key] = {
-                        'issue': ticket,
-                        'searches': [search['name']]
-                    }
-                else:
-                    all_tickets[ticket_key]['searches'].append(search['name'])
-
-            # Print sample tickets
-            if tickets:
-                print(f"\nSample tickets from this search:")
-                for i, ticket in enumerate(tickets[:5], 1):
-                    fields = ticket['fields']
-                    summary = fields.get('summary', '')
-                    priority = fields.get('priority', {})
-                    priority_name = priority.get('name', 'None') if priority else 'None'
-
-                    description = fields.get('description', '')
-                    if description and isinstance(description, dict):
-                        desc_text = extract_text_from_adf(description)[:100]
-                    else:
-                        desc_text = str(description)[:100] if description else ''
-
-                    print(f"  {i}. {ticket['key']}: {summary}")
-                    print(f"     Priority: {priority_name}")
-                    print(f"     Description: {desc_text}...")
-                    print()
-
-        except Exception as e:
-            print(f"Error in search: {e}")
+        # Print sample tickets
+        if matches:
+            print(f"\nSample tickets from this search:")
+            for i, ticket in enumerate(matches[:5], 1):
+                print(f"  {i}. {ticket['key']}: {ticket['summary']}")
+                print(f"     Priority: {ticket['priority']}")
+                print(f"     Description: {ticket['description'][:100]}...")
+                print()
 
     print("\n" + "=" * 80)
-    print(f"TOTAL UNIQUE TICKETS FOUND: {len(all_tickets)}")
+    print(f"TOTAL UNIQUE TICKETS FOUND: {len(tickets)}")
     print("=" * 80)
 
     # Analyze all unique tickets
-    if all_tickets:
+    if tickets:
         print("\n" + "=" * 80)
         print("DETAILED ANALYSIS OF UNIQUE TICKETS")
         print("=" * 80)
 
-        priority_counts = Counter()
-        status_counts = Counter()
-        issue_type_counts = Counter()
-
-        # Common words in summaries
-        summary_words = Counter()
-
-        # Phrases and patterns
-        common_phrases = []
-
-        for ticket_key, ticket_data in all_tickets.items():
-            issue = ticket_data['issue']
-            fields = issue['fields']
-
-            summary = fields.get('summary', '').lower()
-            description = fields.get('description', '')
-
-            if description and isinstance(description, dict):
-                desc_text = extract_text_from_adf(description).lower()
-            else:
-                desc_text = str(description).lower() if description else ''
-
-            priority = fields.get('priority', {})
-            priority_name = priority.get('name', 'None') if priority else 'None'
-            priority_counts[priority_name] += 1
-
-            status = fields.get('status', {})
-            status_name = status.get('name', 'Unknown') if status else 'Unknown'
-            status_counts[status_name] += 1
-
-            issue_type = fields.get('issuetype', {})
-            issue_type_name = issue_type.get('name', 'Unknown') if issue_type else 'Unknown'
-            issue_type_counts[issue_type_name] += 1
-
-            # Extract words from summary
-            words = summary.split()
-            for word in words:
-                if len(word) > 3:  # Only meaningful words
-                    summary_words[word] += 1
-
         print("\n1. PRIORITY DISTRIBUTION")
         print("-" * 80)
-        for priority, count in priority_counts.most_common():
-            percentage = (count / len(all_tickets) * 100)
+        for priority, count in stats['priority_counts'].most_common():
+            percentage = (count / len(tickets) * 100)
             print(f"{priority:<20} {count:<10} {percentage:.1f}%")
 
         print("\n2. STATUS DISTRIBUTION")
         print("-" * 80)
-        for status, count in status_counts.most_common():
-            percentage = (count / len(all_tickets) * 100)
+        for status, count in stats['status_counts'].most_common():
+            percentage = (count / len(tickets) * 100)
             print(f"{status:<20} {count:<10} {percentage:.1f}%")
 
         print("\n3. ISSUE TYPE DISTRIBUTION")
         print("-" * 80)
-        for issue_type, count in issue_type_counts.most_common():
-            percentage = (count / len(all_tickets) * 100)
+        for issue_type, count in stats['issue_type_counts'].most_common():
+            percentage = (count / len(tickets) * 100)
             print(f"{issue_type:<20} {count:<10} {percentage:.1f}%")
 
         print("\n4. MOST COMMON WORDS IN SUMMARIES")
         print("-" * 80)
         print(f"{'Word':<20} {'Frequency':<10}")
         print("-" * 80)
-        for word, count in summary_words.most_common(20):
+        for word, count in stats['summary_words'].most_common(20):
             print(f"{word:<20} {count:<10}")
 
         print("\n5. TICKETS APPEARING IN MULTIPLE SEARCHES (High Relevance)")
         print("-" * 80)
-        multi_search_tickets = {k: v for k, v in all_tickets.items() if len(v['searches']) > 1}
-
-        if multi_search_tickets:
-            for ticket_key, ticket_data in sorted(multi_search_tickets.items(),
-                                                   key=lambda x: len(x[1]['searches']),
-                                                   reverse=True):
-                issue = ticket_data['issue']
-                fields = issue['fields']
-                summary = fields.get('summary', '')
-                searches = ticket_data['searches']
-
-                print(f"\n{ticket_key}: {summary}")
+
+        if stats['multi_rows']:
+            for ticket in stats['multi_rows']:
+                searches = ticket['searches']
+                print(f"\n{ticket['key']}: {ticket['summary']}")
                 print(f"  Found in {len(searches)} searches: {', '.join(searches)}")
-                print(f"  URL: https://adgear.atlassian.net/browse/{ticket_key}")
+                print(f"  URL: https://adgear.atlassian.net/browse/{ticket['key']}")
         else:
             print("No tickets found in multiple searches")
 
@@ -254,29 +344,13 @@ def analyze_focused_pixel_tickets():
         print("ALL UNIQUE PIXEL-RELATED TICKETS")
         print("=" * 80)
 
-        for i, (ticket_key, ticket_data) in enumerate(sorted(all_tickets.items()), 1):
-            issue = ticket_data['issue']
-            fields = issue['fields']
-
-            summary = fields.get('summary', '')
-            priority = fields.get('priority', {})
-            priority_name = priority.get('name', 'None') if priority else 'None'
-            status = fields.get('status', {})
-            status_name = status.get('name', 'Unknown') if status else 'Unknown'
-            created = fields.get('created', '')
-
-            description = fields.get('description', '')
-            if description and isinstance(description, dict):
-                desc_text = extract_text_from_adf(description)
-            else:
-                desc_text = str(description) if description else ''
-
-            print(f"\n{i}. {ticket_key} - {summary}")
-            print(f"   Priority: {priority_name} | Status: {status_name}")
-            print(f"   Created: {created}")
-            print(f"   Description: {desc_text[:200]}...")
-            print(f"   Searches: {', '.join(ticket_data['searches'])}")
-            print(f"   URL: https://adgear.atlassian.net/browse/{ticket_key}")
+        for i, ticket in enumerate(stats['analysis_rows'], 1):
+            print(f"\n{i}. {ticket['key']} - {ticket['summary']}")
+            print(f"   Priority: {ticket['priority']} | Status: {ticket['status']}")
+            print(f"   Created: {ticket['created']}")
+            print(f"   Description: {ticket['description'][:200]}...")
+            print(f"   Searches: {', '.join(ticket['searches'])}")
+            print(f"   URL: https://adgear.atlassian.net/browse/{ticket['key']}")
 
     print("\n" + "=" * 80)
     print("RECOMMENDATIONS FOR WEB PIXEL DETECTION")
@@ -336,5 +410,35 @@ def analyze_focused_pixel_tickets():
     print("ANALYSIS COMPLETE")
     print("=" * 80)
 
+def analyze_focused_pixel_tickets(cache_path=None):
+    """Focused analysis on specific pixel-related searches"""
+    print("=" * 80)
+    print("FOCUSED JIRA PIXEL RESEARCH - PS PROJECT")
+    print("=" * 80)
+    print()
+
+    if cache_path and os.path.exists(cache_path):
+        print(f"Loading cached tickets from {cache_path}")
+        tickets = load_tickets(cache_path)
+    else:
+        tickets = fetch_tickets()
+        if tickets is None:
+            # Never cache a failed fetch, or later --cache runs would reuse it
+            print("Fetching tickets failed; nothing to analyze")
+            return
+        if cache_path:
+            save_tickets(tickets, cache_path)
+            print(f"Cached {len(tickets)} tickets to {cache_path}")
+
+    print_report(tickets, analyze_tickets(tickets))
+
+def main():
+    parser = argparse.ArgumentParser(description='Focused Jira pixel ticket research')
+    parser.add_argument('--cache', metavar='PATH',
+                       help='JSON Lines ticket cache; read if present, otherwise written after fetching')
+
+    args = parser.parse_args()
+    analyze_focused_pixel_tickets(cache_path=args.cache)
+
 if __name__ == '__main__':
-    analyze_focused_pixel_tickets()
+    main()
@@ -6,12 +6,24 @@ Analyzes PS project tickets to understand web pixel-related issues and patterns.
 
 import requests
 import base64
+import html
 import json
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from collections import Counter, defaultdict
 import re
 
+try:
+    import orjson  # Optional: faster decoding of paginated search results
+except ImportError:
+    orjson = None
+
+# Shared helpers live in core/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+from keyword_scanner import build_keyword_scanner, scan_keywords
+
 # Jira Configuration
 JIRA_CONFIG = {
     'base_url': 'https://adgear.atlassian.net',
@@ -35,6 +47,26 @@ PIXEL_KEYWORDS = [
     'integration'
 ]
 
+# Jira's default priority scheme, counted server-side by count_by_priority
+JIRA_PRIORITIES = ['Highest', 'High', 'Medium', 'Low', 'Lowest']
+
+# Words that place a ticket in each analysis category
+CATEGORY_WORDS = {
+    'implementation': ('implement', 'install', 'setup', 'deploy', 'add'),
+    'troubleshooting': ('not working', 'broken', 'issue', 'problem', 'error', 'fail'),
+    'performance': ('slow', 'performance', 'speed', 'optimize', 'latency'),
+    'guidance': ('how to', 'question', 'help', 'guidance', 'documentation'),
+}
+
+# Example tickets shown per category in the analysis report
+CATEGORY_EXAMPLES = 5
+
+# Only the fields read by analyze_pixel_tickets
+ANALYSIS_FIELDS = ['summary', 'description', 'priority', 'status', 'issuetype', 'labels']
+
+# Strips tags from Jira's server-rendered (HTML) field values
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
 def make_jira_request(endpoint, method='GET', data=None):
     """Make authenticated request to Jira API"""
     auth_string = f"{JIRA_CONFIG['email']}:{JIRA_CONFIG['token']}"
@@ -55,13 +87,15 @@ def make_jira_request(endpoint, method='GET', data=None):
             response = requests.get(url, headers=headers, timeout=30)
 
         response.raise_for_status()
+        if orjson is not None:
+            return orjson.loads(response.content)
         return response.json()
 
     except requests.exceptions.RequestException as e:
         print(f"Jira API request failed: {e}")
         raise
 
-def search_issues(jql, fields=None, max_results=100):
+def search_issues(jql, fields=None, max_results=100, expand='renderedFields'):
     """Search Jira issues using JQL"""
     if fields is None:
         fields = ['key', 'summary', 'description', 'status', 'priority', 'created',
@@ -72,24 +106,55 @@ def search_issues(jql, fields=None, max_results=100):
         'fields': fields,
         'maxResults': max_results
     }
+    if expand:
+        # renderedFields lets Jira convert ADF descriptions to HTML server-side
+        data['expand'] = expand
 
     return make_jira_request('/rest/api/3/search/jql', method='POST', data=data)
 
+def get_count(jql):
+    """Get the approximate number of issues matching JQL without fetching them"""
+    result = make_jira_request('/rest/api/3/search/approximate-count', method='POST', data={'jql': jql})
+    return result.get('count', 0)
+
+def count_by_priority(base_jql):
+    """Count matching issues per priority, one parallel count request per bucket"""
+    with ThreadPoolExecutor(max_workers=len(JIRA_PRIORITIES)) as executor:
+        counts = executor.map(
+            lambda priority: get_count(f'{base_jql} AND priority = "{priority}"'),
+            JIRA_PRIORITIES
+        )
+        return Counter({priority: count for priority, count in zip(JIRA_PRIORITIES, counts) if count})
+
+def build_pixel_jql(created_after):
+    """Build the JQL matching pixel keyword tickets created after a date"""
+    keyword_search_terms = ' OR '.join([f'text ~ "{keyword}"' for keyword in PIXEL_KEYWORDS])
+    return f"project={JIRA_CONFIG['project_key']} AND created >= '{created_after}' AND ({keyword_search_terms})"
+
+def get_description_text(issue):
+    """Get plain-text description, preferring Jira's rendered HTML over ADF"""
+    rendered = (issue.get('renderedFields') or {}).get('description')
+    if rendered:
+        return html.unescape(HTML_TAG_RE.sub(' ', rendered))
+
+    # Fall back to walking the ADF tree client-side
+    description = issue['fields'].get('description', '')
+    if description and isinstance(description, dict):
+        return extract_text_from_adf(description)
+    return str(description) if description else ''
+
+# One scanner covering both keyword counting and categorization
+KEYWORD_SCANNER = build_keyword_scanner(
+    PIXEL_KEYWORDS + [word for words in CATEGORY_WORDS.values() for word in words]
+)
+
 def extract_keywords_from_text(text):
     """Extract relevant keywords from text"""
     if not text:
         return []
 
-    # Convert to lowercase for matching
-    text_lower = text.lower()
-
-    # Find all matching keywords
-    found_keywords = []
-    for keyword in PIXEL_KEYWORDS:
-        if keyword in text_lower:
-            found_keywords.append(keyword)
-
-    return found_keywords
+    found = scan_keywords(KEYWORD_SCANNER, text)
+    return [keyword for keyword in PIXEL_KEYWORDS if keyword in found]
 
 def analyze_pixel_tickets():
     """Main analysis function"""
@@ -106,16 +171,14 @@ def analyze_pixel_tickets():
 
     # Search for tickets containing pixel-related keywords
     all_pixel_tickets = []
-    keyword_search_terms = ' OR '.join([f'text ~ "{keyword}"' for keyword in PIXEL_KEYWORDS])
-
-    jql = f"project={JIRA_CONFIG['project_key']} AND created >= '{six_months_ago}' AND ({keyword_search_terms})"
+    jql = build_pixel_jql(six_months_ago)
 
     print(f"JQL Query: {jql}")
     print()
     print("Fetching tickets from Jira...")
 
     try:
-        result = search_issues(jql, max_results=200)
+        result = search_issues(jql, fields=ANALYSIS_FIELDS, max_results=200)
         all_pixel_tickets = result.get('issues', [])
 
         print(f"Found {len(all_pixel_tickets)} pixel-related tickets")
@@ -126,7 +189,7 @@ def analyze_pixel_tickets():
             print("No pixel-related tickets found. Trying broader search...")
             # Try a broader search with just "pixel" or "tracking"
             jql = f"project={JIRA_CONFIG['project_key']} AND created >= '{six_months_ago}' AND (text ~ 'pixel' OR text ~ 'tracking')"
-            result = search_issues(jql, max_results=200)
+            result = search_issues(jql, fields=ANALYSIS_FIELDS, max_results=200)
             all_pixel_tickets = result.get('issues', [])
             print(f"Broader search found {len(all_pixel_tickets)} tickets")
             print()
@@ -138,13 +201,20 @@ def analyze_pixel_tickets():
         status_counts = Counter()
         label_counts = Counter()
 
-        # Categorization
+        # Categorization: only the printed examples are kept, plus a total per category
         issue_categories = defaultdict(list)
+        category_counts = Counter()
 
         # Common phrases in summaries and descriptions
         all_summaries = []
         all_descriptions = []
 
+        # Per-ticket values, counted in one Counter.update each after the loop
+        priority_names = []
+        issue_type_names = []
+        status_names = []
+        all_labels = []
+
         print("\nANALYZING TICKETS...")
         print("=" * 80)
         print()
@@ -155,14 +225,7 @@ def analyze_pixel_tickets():
             fields = issue['fields']
 
             summary = fields.get('summary', '')
-            description = fields.get('description', '')
-
-            # Handle description structure (Jira API v3 uses ADF format)
-            if description and isinstance(description, dict):
-                # Extract text from Atlassian Document Format
-                description_text = extract_text_from_adf(description)
-            else:
-                description_text = str(description) if description else ''
+            description_text = get_description_text(issue)
 
             priority = fields.get('priority', {})
             priority_name = priority.get('name', 'None') if priority else 'None'
@@ -175,42 +238,34 @@ def analyze_pixel_tickets():
 
             labels = fields.get('labels', [])
 
-            # Extract keywords
-            summary_keywords = extract_keywords_from_text(summary)
-            desc_keywords = extract_keywords_from_text(description_text)
-            all_keywords = set(summary_keywords + desc_keywords)
+            # Scan summary and description once; the newline keeps phrases
+            # from matching across the two fields
+            found = scan_keywords(KEYWORD_SCANNER, summary + '\n' + description_text)
 
             # Update counts
-            for keyword in all_keywords:
-                keyword_counts[keyword] += 1
+            keyword_counts.update(keyword for keyword in PIXEL_KEYWORDS if keyword in found)
 
-            priority_counts[priority_name] += 1
-            issue_type_counts[issue_type_name] += 1
-            status_counts[status_name] += 1
-
-            for label in labels:
-                label_counts[label] += 1
+            priority_names.append(priority_name)
+            issue_type_names.append(issue_type_name)
+            status_names.append(status_name)
+            all_labels.extend(labels)
 
             # Store summaries and descriptions
             all_summaries.append(summary)
             all_descriptions.append(description_text)
 
             # Categorize issues
-            if any(word in summary.lower() or word in description_text.lower()
-                   for word in ['implement', 'install', 'setup', 'deploy', 'add']):
-                issue_categories['implementation'].append((key, summary))
-
-            if any(word in summary.lower() or word in description_text.lower()
-                   for word in ['not working', 'broken', 'issue', 'problem', 'error', 'fail']):
-                issue_categories['troubleshooting'].append((key, summary))
-
-            if any(word in summary.lower() or word in description_text.lower()
-                   for word in ['slow', 'performance', 'speed', 'optimize', 'latency']):
-                issue_categories['performance'].append((key, summary))
-
-            if any(word in summary.lower() or word in description_text.lower()
-                   for word in ['how to', 'question', 'help', 'guidance', 'documentation']):
-                issue_categories['guidance'].append((key, summary))
+            for category, words in CATEGORY_WORDS.items():
+                if not found.isdisjoint(words):
+                    category_counts[category] += 1
+                    examples = issue_categories[category]
+                    if len(examples) < CATEGORY_EXAMPLES:
+                        examples.append((key, summary))
+
+        priority_counts.update(priority_names)
+        issue_type_counts.update(issue_type_names)
+        status_counts.update(status_names)
+        label_counts.update(all_labels)
 
         # Print Analysis Results
         print("\n1. KEYWORD FREQUENCY ANALYSIS")
@@ -258,12 +313,13 @@ def analyze_pixel_tickets():
 
         print("\n6. ISSUE CATEGORIZATION")
         print("-" * 80)
-        for category, tickets in issue_categories.items():
-            print(f"\n{category.upper()} ({len(tickets)} tickets):")
-            for key, summary in tickets[:5]:  # Show first 5 examples
+        for category, examples in issue_categories.items():
+            total = category_counts[category]
+            print(f"\n{category.upper()} ({total} tickets):")
+            for key, summary in examples:
                 print(f"  - {key}: {summary[:70]}...")
-            if len(tickets) > 5:
-                print(f"  ... and {len(tickets) - 5} more")
+            if total > len(examples):
+                print(f"  ... and {total - len(examples)} more")
 
         print("\n7. SAMPLE TICKETS (First 10)")
         print("=" * 80)
@@ -275,12 +331,7 @@ def analyze_pixel_tickets():
             priority_name = priority.get('name', 'None') if priority else 'None'
             status = fields.get('status', {})
             status_name = status.get('name', 'Unknown') if status else 'Unknown'
-
-            description = fields.get('description', '')
-            if description and isinstance(description, dict):
-                description_text = extract_text_from_adf(description)
-            else:
-                description_text = str(description) if description else ''
+            description_text = get_description_text(issue)
 
             print(f"\n{i}. {key} - {summary}")
             print(f"   Priority: {priority_name} | Status: {status_name}")
@@ -353,5 +404,31 @@ def extract_text_from_adf(adf_content):
     extract_recursive(adf_content)
     return ' '.join(text_parts)
 
+def analyze_priority_counts():
+    """Print the priority distribution from server-side counts, without downloading issues"""
+    six_months_ago = (datetime.now() - timedelta(days=180)).strftime('%Y-%m-%d')
+    jql = build_pixel_jql(six_months_ago)
+
+    print("=" * 80)
+    print("JIRA PIXEL PRIORITY COUNTS - PS PROJECT")
+    print("=" * 80)
+    print(f"\nJQL Query: {jql}")
+
+    try:
+        priority_counts = count_by_priority(jql)
+    except Exception as e:
+        print(f"Error during count: {e}")
+        return
+
+    total_tickets = sum(priority_counts.values())
+    print(f"\n{'Priority':<20} {'Count':<10} {'Percentage':<10}")
+    print("-" * 80)
+    for priority, count in priority_counts.most_common():
+        percentage = (count / total_tickets * 100) if total_tickets > 0 else 0
+        print(f"{priority:<20} {count:<10} {percentage:.1f}%")
+
 if __name__ == '__main__':
-    analyze_pixel_tickets()
+    if len(sys.argv) > 1 and sys.argv[1] == 'counts':
+        analyze_priority_counts()
+    else:
+        analyze_pixel_tickets()
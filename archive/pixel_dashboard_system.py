@@ -5,16 +5,34 @@ Aggregates pixel-related tickets and provides classification and analytics
 Based on PS-9074 example for GOLO pixel data discrepancy
 """
 
+import atexit
+import csv
 import json
+import re
 import requests
-import base64
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
 import logging
+import threading
+import os
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
-import pandas as pd
+from pathlib import Path
+
+try:
+    import orjson  # Optional: faster Jira response decoding and raw-ticket serialization
+except ImportError:
+    orjson = None
+
+# Shared helpers live in core/
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'core'))
+from jira_session import create_jira_session
+from keyword_scanner import build_keyword_scanner, scan_keywords
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -41,6 +59,71 @@ class PixelPriority(Enum):
     MEDIUM = "medium"        # Standard implementation requests
     LOW = "low"             # Non-urgent validation/testing
 
+# Category classification based on PS-9074 patterns
+CATEGORY_RULES = {
+    PixelIssueCategory.DATA_DISCREPANCY: frozenset([
+        'similar data between', 'data mismatch', 'discrepancy',
+        '1p and 3p', 'user count', 'not seeing similar', 'confirmation page data'
+    ]),
+    PixelIssueCategory.IMPLEMENTATION: frozenset([
+        'pixel not firing', 'implementation', 'setup', 'install pixel',
+        'place pixel', 'add pixel', 'deploy pixel'
+    ]),
+    PixelIssueCategory.VALIDATION: frozenset([
+        'validation', 'validate', 'test pixel', 'verify pixel',
+        'check pixel', 'pixel testing'
+    ]),
+    PixelIssueCategory.TROUBLESHOOTING: frozenset([
+        'troubleshoot', 'debug', 'investigate', 'pixel issue',
+        'not working', 'broken pixel', '0 conversions'
+    ]),
+    PixelIssueCategory.CONVERSION_ISSUES: frozenset([
+        'conversion', 'conversion tracking', 'purchase tracking',
+        'conversion pixel', 'revenue tracking'
+    ]),
+    PixelIssueCategory.GTM_RELATED: frozenset([
+        'gtm', 'google tag manager', 'tag manager', 'data layer',
+        'gtm container', 'tag configuration'
+    ]),
+    PixelIssueCategory.CROSS_DOMAIN: frozenset([
+        'cross domain', 'cross-domain', 'subdomain', 'multiple domains',
+        'domain tracking'
+    ]),
+    PixelIssueCategory.REPORTING: frozenset([
+        'reporting', 'analytics', 'dashboard', 'report data',
+        'metrics', 'performance data'
+    ])
+}
+
+# Priority keywords; anything matching neither set is medium
+PRIORITY_HIGH_KEYWORDS = frozenset(['critical', 'urgent', 'high priority', 'revenue impact', 'client escalation'])
+PRIORITY_LOW_KEYWORDS = frozenset(['low', 'nice to have', 'future', 'enhancement'])
+HIGH_JIRA_PRIORITIES = frozenset(['critical', 'high'])
+
+CLASSIFICATION_SCANNER = build_keyword_scanner(
+    [word for words in CATEGORY_RULES.values() for word in words]
+    + list(PRIORITY_HIGH_KEYWORDS) + list(PRIORITY_LOW_KEYWORDS)
+)
+
+# Common client extraction patterns, tried in order
+CLIENT_PATTERNS = [
+    re.compile(r'client[:\s]+([A-Z][A-Za-z\s&]+)'),
+    re.compile(r'([A-Z][A-Za-z\s&]+)\s+pixel'),
+    re.compile(r'([A-Z][A-Za-z\s&]+)\s+campaign'),
+]
+CLIENT_STOPWORDS = frozenset(['the', 'and', 'for', 'with'])
+
+# Batches at least this large are classified in a process pool
+PARALLEL_PROCESSING_THRESHOLD = 200
+
+def normalize_jira_timestamp(value: str) -> str:
+    """Rewrite Jira's 'Z' / '+0000' offsets as '+00:00' so SQLite date functions can read them"""
+    if value.endswith('Z'):
+        return value[:-1] + '+00:00'
+    if len(value) > 5 and value[-5] in '+-' and value[-4:].isdigit():
+        return f"{value[:-2]}:{value[-2:]}"
+    return value
+
 @dataclass
 class PixelTicket:
     """Structured pixel ticket data"""
@@ -59,18 +142,198 @@ class PixelTicket:
     tags: List[str] = None
     resolution_time: Optional[timedelta] = None
 
+# Ticket processing lives at module level so process pool workers can run it
+def extract_client_from_ticket(ticket: Dict, description_text: Optional[str] = None) -> Optional[str]:
+    """Extract client name from ticket data"""
+    fields = ticket.get('fields', {})
+
+    # Check custom field (like PS-9074's client field)
+    client_field = fields.get('customfield_10610')  # Based on PS-9074
+    if client_field:
+        return client_field.strip()
+
+    # Extract from summary or description
+    summary = fields.get('summary', '').lower()
+    description = description_text
+    if description is None:
+        description = fields.get('description', '')
+        if isinstance(description, dict):
+            description = extract_text_from_jira_content(description)
+    description = description.lower()
+
+    text = f"{summary} {description}"
+    for pattern in CLIENT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            client = match.group(1).strip()
+            if len(client) > 2 and client.lower() not in CLIENT_STOPWORDS:
+                return client
+
+    return None
+
+def extract_text_from_jira_content(content: Dict) -> str:
+    """Extract plain text from Jira's rich content format"""
+    # Walk the tree with an explicit stack; leaf texts come out in document
+    # order and empty containers still count as one (empty) part
+    text_parts = []
+    stack = [content]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if 'content' in node:
+                children = node['content']
+            else:
+                text_parts.append(node.get('text', ''))
+                continue
+        elif isinstance(node, list):
+            children = node
+        elif isinstance(node, str):
+            text_parts.append(node)
+            continue
+        else:
+            text_parts.append(str(node))
+            continue
+
+        if children:
+            stack.extend(reversed(children))
+        else:
+            text_parts.append('')
+
+    return ' '.join(text_parts)
+
+def classify_pixel_ticket(ticket: Dict,
+                          description_text: Optional[str] = None) -> Tuple[PixelIssueCategory, PixelPriority]:
+    """Classify ticket based on content analysis"""
+    fields = ticket.get('fields', {})
+    summary = fields.get('summary', '')
+    description = description_text
+    if description is None:
+        description = fields.get('description', '')
+        if isinstance(description, dict):
+            description = extract_text_from_jira_content(description)
+
+    # One pass over the text finds every category and priority keyword
+    found = scan_keywords(CLASSIFICATION_SCANNER, f"{summary} {description}")
+
+    # Determine category
+    category = PixelIssueCategory.IMPLEMENTATION  # Default
+    max_matches = 0
+
+    for cat, keywords in CATEGORY_RULES.items():
+        matches = len(found & keywords)
+        if matches > max_matches:
+            max_matches = matches
+            category = cat
+
+    # Priority classification
+    jira_priority = fields.get('priority', {}).get('name', '').lower()
+
+    if found & PRIORITY_HIGH_KEYWORDS or jira_priority in HIGH_JIRA_PRIORITIES:
+        pixel_priority = PixelPriority.HIGH
+    elif found & PRIORITY_LOW_KEYWORDS or jira_priority == 'low':
+        pixel_priority = PixelPriority.LOW
+    else:
+        pixel_priority = PixelPriority.MEDIUM
+
+    return category, pixel_priority
+
+def build_ticket_rows(ticket: Dict) -> Tuple[Optional[Tuple], Optional[Tuple], Optional[str]]:
+    """Extract, classify and serialize one ticket into (row, raw_row, error)"""
+    try:
+        fields = ticket.get('fields', {})
+
+        # Extract basic data
+        key = ticket.get('key')
+        summary = fields.get('summary', '')
+        description = fields.get('description', '')
+        if isinstance(description, dict):
+            description = extract_text_from_jira_content(description)
+
+        status = fields.get('status', {}).get('name', '')
+        priority = fields.get('priority', {}).get('name', '')
+
+        # Dates are stored as ISO strings; they are only parsed for resolution time
+        created = normalize_jira_timestamp(fields.get('created', ''))
+        updated = normalize_jira_timestamp(fields.get('updated', ''))
+        if not created or not updated:
+            raise ValueError("missing created/updated timestamp")
+
+        # Extract people
+        assignee = fields.get('assignee', {})
+        assignee_name = assignee.get('displayName') if assignee else None
+
+        reporter = fields.get('reporter', {})
+        reporter_name = reporter.get('displayName') if reporter else 'Unknown'
+
+        # Extract client
+        client = extract_client_from_ticket(ticket, description)
+
+        # Classify ticket
+        category, pixel_priority = classify_pixel_ticket(ticket, description)
+
+        # Calculate resolution time if resolved
+        resolution_time_hours = None
+        resolution_date = fields.get('resolutiondate')
+        if resolution_date:
+            resolved = datetime.fromisoformat(normalize_jira_timestamp(resolution_date))
+            resolution_time_hours = (resolved - datetime.fromisoformat(created)).total_seconds() / 3600
+
+        row = (
+            key, summary, description, status, priority, created, updated,
+            assignee_name, reporter_name, client, category.value, pixel_priority.value,
+            resolution_time_hours
+        )
+        raw_json = orjson.dumps(ticket) if orjson is not None else json.dumps(ticket).encode()
+        return row, (key, zlib.compress(raw_json, 6)), None
+
+    except Exception as e:
+        return None, None, str(e)
+
 class PixelDashboardSystem:
     """Main dashboard system for pixel issue management"""
 
-    def __init__(self, jira_config: Dict):
+    def __init__(self, jira_config: Dict, cache_ttl: int = 300, raw_retention_days: int = 90):
         self.jira_config = jira_config
         self.db_path = "pixel_dashboard.db"
+        self.raw_retention_days = raw_retention_days
+
+        # In-memory dashboard cache; process_and_store_tickets invalidates it
+        self.cache_ttl = cache_ttl
+        self._cache = {}
+        self._cache_ts = 0
+
+        self.session = self.create_jira_session()
+
+        # One long-lived writer connection, serialized by a lock
+        self._write_lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
         self.init_database()
 
+        # Dashboard reads go through a separate read-only connection so WAL
+        # readers never wait on a sync that is writing
+        self._read_lock = threading.Lock()
+        self.read_conn = sqlite3.connect(f"{Path(self.db_path).resolve().as_uri()}?mode=ro",
+                                         uri=True, check_same_thread=False)
+        self.read_conn.execute('PRAGMA cache_size=-20000')
+        # generate_dashboard_data builds its TEMP table on this connection
+        self.read_conn.execute('PRAGMA temp_store=MEMORY')
+
+        atexit.register(self.close)
+
+    def close(self):
+        """Close the database connections"""
+        self.read_conn.close()
+        self.conn.close()
+
     def init_database(self):
         """Initialize dashboard database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cursor = self.conn.cursor()
+
+        # Bulk-write tuning: WAL journal, fewer fsyncs, in-memory temp tables, ~20 MB page cache
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.execute('PRAGMA cache_size=-20000')
 
         # Pixel tickets table
         cursor.execute('''
@@ -90,11 +353,18 @@ class PixelDashboardSystem:
                 pixel_priority TEXT,
                 tags TEXT, -- JSON array of tags
                 resolution_time_hours REAL,
-                raw_data TEXT, -- Full JSON ticket data
                 last_sync DATETIME DEFAULT CURRENT_TIMESTAMP
             )
         ''')
 
+        # Full ticket JSON, zlib-compressed and kept out of the aggregated table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pixel_tickets_raw (
+                ticket_key TEXT PRIMARY KEY,
+                raw_data BLOB NOT NULL
+            )
+        ''')
+
         # Classification rules table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS classification_rules (
@@ -126,362 +396,298 @@ class PixelDashboardSystem:
             )
         ''')
 
-        conn.commit()
-        conn.close()
+        # Indexes matching the generate_dashboard_data predicates. The 30-day
+        # aggregations read the temp.recent copy, so only the range scan that
+        # fills it needs created_date; the old per-aggregation composites only
+        # cost writes and ANALYZE time, so databases that have them drop them
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tickets_created ON pixel_tickets(created_date DESC)')
+        cursor.execute('DROP INDEX IF EXISTS idx_tickets_created_cat')
+        cursor.execute('DROP INDEX IF EXISTS idx_tickets_created_client')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_tickets_priority_status
+            ON pixel_tickets(pixel_priority, status, created_date DESC)
+        ''')
+
+        # SQLite only picks the composite indexes once it has statistics
+        cursor.execute('ANALYZE pixel_tickets')
+
         logger.info("Dashboard database initialized")
 
+    def create_jira_session(self) -> requests.Session:
+        """Create a keep-alive session carrying the Jira auth headers"""
+        return create_jira_session(self.jira_config)
+
     def make_jira_request(self, endpoint: str, method: str = 'GET', data: Dict = None) -> Dict:
         """Make authenticated Jira API request"""
-        auth_string = f"{self.jira_config['email']}:{self.jira_config['token']}"
-        auth_bytes = base64.b64encode(auth_string.encode()).decode()
-
-        headers = {
-            'Authorization': f'Basic {auth_bytes}',
-            'Accept': 'application/json',
-            'Content-Type': 'application/json'
-        }
-
         url = f"{self.jira_config['base_url']}{endpoint}"
 
         try:
             if method == 'POST':
-                response = requests.post(url, headers=headers, json=data, timeout=30)
+                response = self.session.post(url, json=data, timeout=30)
             else:
-                response = requests.get(url, headers=headers, timeout=30)
+                response = self.session.get(url, timeout=30)
 
             response.raise_for_status()
+            if orjson is not None:
+                return orjson.loads(response.content)
             return response.json()
 
         except requests.exceptions.RequestException as e:
             logger.error(f"Jira API request failed: {e}")
             raise
 
-    def fetch_pixel_tickets(self, days_back: int = 90) -> List[Dict]:
-        """Fetch pixel-related tickets from Jira"""
+    def fetch_pixel_tickets(self, days_back: int = 90, updated_since: Optional[str] = None) -> List[Dict]:
+        """Fetch pixel-related tickets from Jira
+
+        updated_since (a JQL date such as '2024-05-01 09:30') limits an
+        incremental sync to tickets changed since the previous run.
+        """
         # Calculate date range
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days_back)
         jql_start = start_date.strftime('%Y-%m-%d')
 
-        # Enhanced JQL query for pixel tickets based on PS-9074 analysis
-        jql = f'''
-        project = PS AND (
-            summary ~ "pixel" OR
-            description ~ "pixel" OR
-            summary ~ "conversion" OR
-            summary ~ "tracking" OR
-            summary ~ "tag" OR
-            summary ~ "gtm" OR
-            summary ~ "validation" OR
-            summary ~ "discrepancy" OR
-            description ~ "1P and 3P" OR
-            description ~ "Samsung pixel" OR
-            description ~ "data mismatch" OR
-            description ~ "confirmation page" OR
-            description ~ "set up issue" OR
-            summary ~ "implementation"
-        ) AND created >= "{jql_start}"
-        ORDER BY created DESC
-        '''
+        # A dedicated label (if configured) hits the labels index instead of text search
+        pixel_label = self.jira_config.get('pixel_label')
+        if pixel_label:
+            match_clause = f'labels = "{pixel_label}"'
+        else:
+            # Enhanced JQL query for pixel tickets based on PS-9074 analysis,
+            # one text query per field instead of one clause per term
+            match_clause = '''(
+            summary ~ "pixel OR conversion OR tracking OR tag OR gtm OR validation OR discrepancy OR implementation" OR
+            description ~ "pixel OR (1P AND 3P) OR (Samsung AND pixel) OR (data AND mismatch) OR (confirmation AND page) OR (set AND up AND issue)"
+        )'''
+
+        conditions = ['project = PS', match_clause, f'created >= "{jql_start}"']
+        if updated_since:
+            conditions.append(f'updated >= "{updated_since}"')
+        jql = ' AND '.join(conditions) + ' ORDER BY created DESC'
 
         data = {
             'jql': jql,
+            # Only the fields processing uses; the issue key is always returned
             'fields': [
-                'key', 'summary', 'description', 'status', 'priority',
+                'summary', 'description', 'status', 'priority',
                 'created', 'updated', 'assignee', 'reporter', 'resolutiondate',
                 'customfield_10610',  # Client field from PS-9074
-                'labels', 'components'
+                'labels'
             ],
-            'maxResults': 1000
+            'fieldsByKeys': False,
+            'maxResults': 100  # Server-side page size cap
         }
 
         logger.info(f"Fetching pixel tickets from {jql_start}")
-        result = self.make_jira_request('/rest/api/3/search/jql', method='POST', data=data)
 
-        tickets = result.get('issues', [])
+        # Follow the nextPageToken cursor until Jira reports the last page
+        tickets = []
+        while True:
+            result = self.make_jira_request('/rest/api/3/search/jql', method='POST', data=data)
+            tickets.extend(result.get('issues', []))
+
+            next_page_token = result.get('nextPageToken')
+            if result.get('isLast', True) or not next_page_token:
+                break
+            data['nextPageToken'] = next_page_token
+
         logger.info(f"Found {len(tickets)} potential pixel tickets")
 
         return tickets
 
-    def extract_client_from_ticket(self, ticket: Dict) -> Optional[str]:
+    def extract_client_from_ticket(self, ticket: Dict, description_text: Optional[str] = None) -> Optional[str]:
         """Extract client name from ticket data"""
-        fields = ticket.get('fields', {})
-
-        # Check custom field (like PS-9074's client field)
-        client_field = fields.get('customfield_10610')  # Based on PS-9074
-        if client_field:
-            return client_field.strip()
-
-        # Extract from summary or description
-        summary = fields.get('summary', '').lower()
-        description = fields.get('description', '')
-        if isinstance(description, dict):
-            description = self.extract_text_from_jira_content(description)
-        description = description.lower()
-
-        # Common client extraction patterns
-        client_patterns = [
-            r'client[:\s]+([A-Z][A-Za-z\s&]+)',
-            r'([A-Z][A-Za-z\s&]+)\s+pixel',
-            r'([A-Z][A-Za-z\s&]+)\s+campaign',
-        ]
-
-        import re
-        text = f"{summary} {description}"
-        for pattern in client_patterns:
-            match = re.search(pattern, text)
-            if match:
-                client = match.group(1).strip()
-                if len(client) > 2 and client.lower() not in ['the', 'and', 'for', 'with']:
-                    return client
-
-        return None
+        return extract_client_from_ticket(ticket, description_text)
 
     def extract_text_from_jira_content(self, content: Dict) -> str:
         """Extract plain text from Jira's rich content format"""
-        if isinstance(content, str):
-            return content
-        elif isinstance(content, dict):
-            text_parts = []
-            if 'content' in content:
-                for item in content['content']:
-                    text_parts.append(self.extract_text_from_jira_content(item))
-            elif 'text' in content:
-                text_parts.append(content['text'])
-            return ' '.join(text_parts)
-        elif isinstance(content, list):
-            text_parts = []
-            for item in content:
-                text_parts.append(self.extract_text_from_jira_content(item))
-            return ' '.join(text_parts)
-        return str(content)
-
-    def classify_pixel_ticket(self, ticket: Dict) -> Tuple[PixelIssueCategory, PixelPriority]:
-        """Classify ticket based on content analysis"""
-        fields = ticket.get('fields', {})
-        summary = fields.get('summary', '').lower()
-        description = fields.get('description', '')
-        if isinstance(description, dict):
-            description = self.extract_text_from_jira_content(description)
-        description = description.lower()
-
-        text = f"{summary} {description}"
-
-        # Category classification based on PS-9074 patterns
-        category_rules = {
-            PixelIssueCategory.DATA_DISCREPANCY: [
-                'similar data between', 'data mismatch', 'discrepancy',
-                '1p and 3p', 'user count', 'not seeing similar', 'confirmation page data'
-            ],
-            PixelIssueCategory.IMPLEMENTATION: [
-                'pixel not firing', 'implementation', 'setup', 'install pixel',
-                'place pixel', 'add pixel', 'deploy pixel'
-            ],
-            PixelIssueCategory.VALIDATION: [
-                'validation', 'validate', 'test pixel', 'verify pixel',
-                'check pixel', 'pixel testing'
-            ],
-            PixelIssueCategory.TROUBLESHOOTING: [
-                'troubleshoot', 'debug', 'investigate', 'pixel issue',
-                'not working', 'broken pixel', '0 conversions'
-            ],
-            PixelIssueCategory.CONVERSION_ISSUES: [
-                'conversion', 'conversion tracking', 'purchase tracking',
-                'conversion pixel', 'revenue tracking'
-            ],
-            PixelIssueCategory.GTM_RELATED: [
-                'gtm', 'google tag manager', 'tag manager', 'data layer',
-                'gtm container', 'tag configuration'
-            ],
-            PixelIssueCategory.CROSS_DOMAIN: [
-                'cross domain', 'cross-domain', 'subdomain', 'multiple domains',
-                'domain tracking'
-            ],
-            PixelIssueCategory.REPORTING: [
-                'reporting', 'analytics', 'dashboard', 'report data',
-                'metrics', 'performance data'
-            ]
-        }
-
-        # Determine category
-        category = PixelIssueCategory.IMPLEMENTATION  # Default
-        max_matches = 0
-
-        for cat, keywords in category_rules.items():
-            matches = sum(1 for keyword in keywords if keyword in text)
-            if matches > max_matches:
-                max_matches = matches
-                category = cat
-
-        # Priority classification
-        priority_high = ['critical', 'urgent', 'high priority', 'revenue impact', 'client escalation']
-        priority_medium = ['medium', 'standard', 'normal']
-        priority_low = ['low', 'nice to have', 'future', 'enhancement']
-
-        jira_priority = fields.get('priority', {}).get('name', '').lower()
-
-        if any(keyword in text for keyword in priority_high) or jira_priority in ['critical', 'high']:
-            pixel_priority = PixelPriority.HIGH
-        elif any(keyword in text for keyword in priority_low) or jira_priority == 'low':
-            pixel_priority = PixelPriority.LOW
-        else:
-            pixel_priority = PixelPriority.MEDIUM
+        return extract_text_from_jira_content(content)
 
-        return category, pixel_priority
+    def classify_pixel_ticket(self, ticket: Dict,
+                              description_text: Optional[str] = None) -> Tuple[PixelIssueCategory, PixelPriority]:
+        """Classify ticket based on content analysis"""
+        return classify_pixel_ticket(ticket, description_text)
 
     def process_and_store_tickets(self, tickets: List[Dict]):
         """Process tickets and store in dashboard database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        processed_count = 0
-
-        for ticket in tickets:
-            try:
-                fields = ticket.get('fields', {})
-
-                # Extract basic data
-                key = ticket.get('key')
-                summary = fields.get('summary', '')
-                description = fields.get('description', '')
-                if isinstance(description, dict):
-                    description = self.extract_text_from_jira_content(description)
-
-                status = fields.get('status', {}).get('name', '')
-                priority = fields.get('priority', {}).get('name', '')
-
-                # Parse dates
-                created = datetime.fromisoformat(fields.get('created', '').replace('Z', '+00:00'))
-                updated = datetime.fromisoformat(fields.get('updated', '').replace('Z', '+00:00'))
-
-                # Extract people
-                assignee = fields.get('assignee', {})
-                assignee_name = assignee.get('displayName') if assignee else None
-
-                reporter = fields.get('reporter', {})
-                reporter_name = reporter.get('displayName') if reporter else 'Unknown'
-
-                # Extract client
-                client = self.extract_client_from_ticket(ticket)
-
-                # Classify ticket
-                category, pixel_priority = self.classify_pixel_ticket(ticket)
-
-                # Calculate resolution time if resolved
-                resolution_time_hours = None
-                resolution_date = fields.get('resolutiondate')
-                if resolution_date:
-                    resolved = datetime.fromisoformat(resolution_date.replace('Z', '+00:00'))
-                    resolution_time_hours = (resolved - created).total_seconds() / 3600
-
-                # Store in database
-                cursor.execute('''
-                    INSERT OR REPLACE INTO pixel_tickets
-                    (ticket_key, summary, description, status, priority, created_date, updated_date,
-                     assignee, reporter, client, category, pixel_priority, resolution_time_hours, raw_data)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    key, summary, description, status, priority, created, updated,
-                    assignee_name, reporter_name, client, category.value, pixel_priority.value,
-                    resolution_time_hours, json.dumps(ticket)
-                ))
-
-                processed_count += 1
-
-            except Exception as e:
-                logger.error(f"Error processing ticket {ticket.get('key', 'unknown')}: {e}")
-                continue
+        # Extract and classify everything first; the database sees one batch.
+        # The work is pure-Python CPU, so large batches fan out across processes
+        if len(tickets) >= PARALLEL_PROCESSING_THRESHOLD:
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+                results = list(executor.map(build_ticket_rows, tickets, chunksize=32))
+        else:
+            results = [build_ticket_rows(ticket) for ticket in tickets]
 
-        conn.commit()
-        conn.close()
+        rows = []
+        raw_rows = []
+        failed = []
 
-        logger.info(f"Processed and stored {processed_count} tickets")
+        for ticket, (row, raw_row, error) in zip(tickets, results):
+            if error is not None:
+                logger.error(f"Error processing ticket {ticket.get('key', 'unknown')}: {error}")
+                failed.append(ticket.get('key', 'unknown'))
+                continue
+            rows.append(row)
+            raw_rows.append(raw_row)
+
+        # Store in database as a single transaction; the connection context
+        # commits it, or rolls back if any insert fails
+        with self._write_lock, self.conn:
+            cursor = self.conn.cursor()
+
+            cursor.execute('BEGIN')
+            cursor.executemany('''
+                INSERT OR REPLACE INTO pixel_tickets
+                (ticket_key, summary, description, status, priority, created_date, updated_date,
+                 assignee, reporter, client, category, pixel_priority, resolution_time_hours)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            cursor.executemany('''
+                INSERT OR REPLACE INTO pixel_tickets_raw (ticket_key, raw_data) VALUES (?, ?)
+            ''', raw_rows)
+
+            # Refresh planner statistics for the new rows
+            cursor.execute('ANALYZE pixel_tickets')
+
+        # Stored tickets changed, so cached analytics are stale
+        self._cache.pop('dashboard', None)
+
+        logger.info(f"Processed and stored {len(rows)} tickets")
+        if failed:
+            logger.warning(f"Failed to process {len(failed)} tickets: {', '.join(failed)}")
+
+    def load_raw_ticket(self, ticket_key: str) -> Optional[Dict]:
+        """Load the stored Jira JSON for a ticket, if it is still retained"""
+        with self._read_lock:
+            row = self.read_conn.execute(
+                'SELECT raw_data FROM pixel_tickets_raw WHERE ticket_key = ?', (ticket_key,)
+            ).fetchone()
+
+        if not row:
+            return None
+        raw_json = zlib.decompress(row[0])
+        return orjson.loads(raw_json) if orjson is not None else json.loads(raw_json)
+
+    def cleanup_old_raw(self) -> int:
+        """Drop raw ticket JSON for tickets created before the retention window"""
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.raw_retention_days)).strftime('%Y-%m-%d')
+
+        with self._write_lock, self.conn:
+            cursor = self.conn.execute('''
+                DELETE FROM pixel_tickets_raw
+                WHERE ticket_key IN (SELECT ticket_key FROM pixel_tickets WHERE created_date < ?)
+            ''', (cutoff,))
+
+        logger.info(f"Removed raw data for {cursor.rowcount} tickets older than {self.raw_retention_days} days")
+        return cursor.rowcount
+
+    def fetch_dicts(self, cursor: sqlite3.Cursor, query: str, params: Tuple = ()) -> List[Dict]:
+        """Run a query and return its rows as column-name dicts"""
+        cursor.execute(query, params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
     def generate_dashboard_data(self) -> Dict:
         """Generate dashboard analytics data"""
-        conn = sqlite3.connect(self.db_path)
-
-        # Get overview metrics
-        overview_query = '''
-            SELECT
-                COUNT(*) as total_tickets,
-                COUNT(CASE WHEN status NOT IN ('Done', 'Resolved', 'Closed') THEN 1 END) as open_tickets,
-                COUNT(CASE WHEN pixel_priority = 'high' THEN 1 END) as high_priority,
-                COUNT(CASE WHEN pixel_priority = 'critical' THEN 1 END) as critical_tickets,
-                AVG(resolution_time_hours) as avg_resolution_hours
-            FROM pixel_tickets
-            WHERE created_date >= date('now', '-30 days')
-        '''
-
-        overview = pd.read_sql_query(overview_query, conn).iloc[0].to_dict()
-
-        # Get category breakdown
-        category_query = '''
-            SELECT
-                category,
-                COUNT(*) as count,
-                COUNT(CASE WHEN status NOT IN ('Done', 'Resolved', 'Closed') THEN 1 END) as open_count,
-                AVG(resolution_time_hours) as avg_resolution_hours
-            FROM pixel_tickets
-            WHERE created_date >= date('now', '-30 days')
-            GROUP BY category
-            ORDER BY count DESC
-        '''
-
-        category_breakdown = pd.read_sql_query(category_query, conn)
-
-        # Get client breakdown
-        client_query = '''
-            SELECT
-                client,
-                COUNT(*) as count,
-                COUNT(CASE WHEN status NOT IN ('Done', 'Resolved', 'Closed') THEN 1 END) as open_count
-            FROM pixel_tickets
-            WHERE created_date >= date('now', '-30 days') AND client IS NOT NULL
-            GROUP BY client
-            ORDER BY count DESC
-            LIMIT 10
-        '''
-
-        client_breakdown = pd.read_sql_query(client_query, conn)
-
-        # Get recent critical tickets
-        critical_query = '''
-            SELECT ticket_key, summary, client, created_date, status
-            FROM pixel_tickets
-            WHERE pixel_priority IN ('critical', 'high')
-            AND status NOT IN ('Done', 'Resolved', 'Closed')
-            ORDER BY created_date DESC
-            LIMIT 10
-        '''
-
-        critical_tickets = pd.read_sql_query(critical_query, conn)
-
-        # Get trend data (last 30 days)
-        trend_query = '''
-            SELECT
-                DATE(created_date) as date,
-                COUNT(*) as tickets_created,
-                COUNT(CASE WHEN pixel_priority = 'high' THEN 1 END) as high_priority_created
-            FROM pixel_tickets
-            WHERE created_date >= date('now', '-30 days')
-            GROUP BY DATE(created_date)
-            ORDER BY date
-        '''
-
-        trend_data = pd.read_sql_query(trend_query, conn)
-
-        conn.close()
+        if 'dashboard' in self._cache and time.monotonic() - self._cache_ts < self.cache_ttl:
+            return self._cache['dashboard']
+
+        with self._read_lock:
+            cursor = self.read_conn.cursor()
+
+            # Same cutoff as date('now', '-30 days'), bound so every query reuses one plan
+            since = (datetime.now(timezone.utc) - timedelta(days=30)).strftime('%Y-%m-%d')
+
+            # Walk the created_date range once into an in-memory temp table; the
+            # 30-day aggregations below all scan that instead of pixel_tickets
+            cursor.execute('DROP TABLE IF EXISTS temp.recent')
+            cursor.execute('''
+                CREATE TEMP TABLE recent AS
+                SELECT created_date, status, category, client, pixel_priority, resolution_time_hours
+                FROM pixel_tickets
+                WHERE created_date >= ?
+            ''', (since,))
+
+            # Get overview metrics
+            overview_query = '''
+                SELECT
+                    COUNT(*) as total_tickets,
+                    COALESCE(SUM(CASE WHEN status NOT IN ('Done', 'Resolved', 'Closed') THEN 1 ELSE 0 END), 0) as open_tickets,
+                    COALESCE(SUM(CASE WHEN pixel_priority = 'high' THEN 1 ELSE 0 END), 0) as high_priority,
+                    COALESCE(SUM(CASE WHEN pixel_priority = 'critical' THEN 1 ELSE 0 END), 0) as critical_tickets,
+                    AVG(resolution_time_hours) as avg_resolution_hours
+                FROM recent
+            '''
+
+            overview = self.fetch_dicts(cursor, overview_query)[0]
+
+            # Get category breakdown
+            category_query = '''
+                SELECT
+                    category,
+                    COUNT(*) as count,
+                    SUM(CASE WHEN status NOT IN ('Done', 'Resolved', 'Closed') THEN 1 ELSE 0 END) as open_count,
+                    AVG(resolution_time_hours) as avg_resolution_hours
+                FROM recent
+                GROUP BY category
+                ORDER BY count DESC
+            '''
+
+            category_breakdown = self.fetch_dicts(cursor, category_query)
+
+            # Get client breakdown
+            client_query = '''
+                SELECT
+                    client,
+                    COUNT(*) as count,
+                    SUM(CASE WHEN status NOT IN ('Done', 'Resolved', 'Closed') THEN 1 ELSE 0 END) as open_count
+                FROM recent
+                WHERE client IS NOT NULL
+                GROUP BY client
+                ORDER BY count DESC
+                LIMIT 10
+            '''
+
+            client_breakdown = self.fetch_dicts(cursor, client_query)
+
+            # Get recent critical tickets
+            critical_query = '''
+                SELECT ticket_key, summary, client, created_date, status
+                FROM pixel_tickets
+                WHERE pixel_priority IN ('critical', 'high')
+                AND status NOT IN ('Done', 'Resolved', 'Closed')
+                ORDER BY created_date DESC
+                LIMIT 10
+            '''
+
+            critical_tickets = self.fetch_dicts(cursor, critical_query)
+
+            # Get trend data (last 30 days)
+            trend_query = '''
+                SELECT
+                    DATE(created_date) as date,
+                    COUNT(*) as tickets_created,
+                    SUM(CASE WHEN pixel_priority = 'high' THEN 1 ELSE 0 END) as high_priority_created
+                FROM recent
+                GROUP BY DATE(created_date)
+                ORDER BY date
+            '''
+
+            trend_data = self.fetch_dicts(cursor, trend_query)
+
+            cursor.execute('DROP TABLE temp.recent')
 
         dashboard_data = {
             'overview': overview,
-            'category_breakdown': category_breakdown.to_dict('records'),
-            'client_breakdown': client_breakdown.to_dict('records'),
-            'critical_tickets': critical_tickets.to_dict('records'),
-            'trend_data': trend_data.to_dict('records'),
+            'category_breakdown': category_breakdown,
+            'client_breakdown': client_breakdown,
+            'critical_tickets': critical_tickets,
+            'trend_data': trend_data,
             'generated_at': datetime.now().isoformat()
         }
 
+        self._cache['dashboard'] = dashboard_data
+        self._cache_ts = time.monotonic()
+
         return dashboard_data
 
     def create_jira_dashboard_filter(self) -> str:
@@ -508,8 +714,6 @@ class PixelDashboardSystem:
         if not filename:
             filename = f"pixel_dashboard_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
 
-        conn = sqlite3.connect(self.db_path)
-
         query = '''
             SELECT
                 ticket_key, summary, description, status, priority,
@@ -519,10 +723,21 @@ class PixelDashboardSystem:
             ORDER BY created_date DESC
         '''
 
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        with self._read_lock:
+            # Stream rows straight from the cursor instead of materializing the table
+            cursor = self.read_conn.cursor()
+            cursor.arraysize = 1000
+            cursor.execute(query)
+
+            with open(filename, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f, lineterminator='\n')
+                writer.writerow([column[0] for column in cursor.description])
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+                    writer.writerows(rows)
 
-        df.to_csv(filename, index=False)
         logger.info(f"Dashboard data exported to {filename}")
 
         return filename
@@ -549,6 +764,7 @@ def main():
 
     print("🔄 Processing and classifying tickets...")
     dashboard.process_and_store_tickets(tickets)
+    dashboard.cleanup_old_raw()
 
     # Generate dashboard
     print("📊 Generating dashboard analytics...")
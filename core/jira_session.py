@@ -0,0 +1,33 @@
+"""
+Jira Session
+Keep-alive HTTP session setup shared by the notification monitor and the dashboard.
+"""
+
+import base64
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+def create_jira_session(jira_config):
+    """Create a keep-alive session carrying the Jira auth headers"""
+    auth_string = f"{jira_config['email']}:{jira_config['token']}"
+    auth_bytes = base64.b64encode(auth_string.encode()).decode()
+
+    session = requests.Session()
+    session.headers.update({
+        'Authorization': f'Basic {auth_bytes}',
+        'Accept': 'application/json',
+        'Accept-Encoding': 'gzip',
+        'Content-Type': 'application/json'
+    })
+
+    # Retry rate limiting and transient server errors with backoff; the pool is
+    # sized for the handful of worker threads that may share one session
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                    allowed_methods=None)
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
@@ -0,0 +1,29 @@
+"""
+Keyword Scanner
+Finds every keyword from a fixed list in one pass over a text, with the same
+substring semantics as checking `keyword in text` for each keyword.
+
+Shared by the notification monitor, the dashboard and the research scripts.
+"""
+
+import re
+
+def build_keyword_scanner(words):
+    """Compile words into a single regex that finds all of them in one pass over the text"""
+    words = sorted(set(words), key=len, reverse=True)
+
+    # The lookahead reports the longest word starting at each offset; any shorter
+    # word matching at that same offset is one of its prefixes. Matching is
+    # case-insensitive (ASCII) so callers need not lowercase whole texts
+    prefixes = {word: frozenset(w for w in words if word.startswith(w)) for word in words}
+    pattern = re.compile('(?=(' + '|'.join(re.escape(word) for word in words) + '))',
+                         re.IGNORECASE | re.ASCII)
+    return pattern, prefixes
+
+def scan_keywords(scanner, text):
+    """Return the set of (lowercase) scanner words occurring anywhere in text"""
+    pattern, prefixes = scanner
+    found = set()
+    for word in set(pattern.findall(text)):
+        found |= prefixes[word.lower()]
+    return found
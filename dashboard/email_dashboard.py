@@ -21,6 +21,9 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# The report covers more than the monitor's short polling window
+REPORT_LOOKBACK_MINUTES = 6 * 60
+
 def get_pixel_tickets():
     """Get recent pixel tickets using proven methods"""
 
@@ -28,7 +31,7 @@ def get_pixel_tickets():
 
     try:
         # Use your existing working method
-        all_tickets = search_recent_tickets()
+        all_tickets = search_recent_tickets(REPORT_LOOKBACK_MINUTES)
 
         if not all_tickets:
             logger.warning("No recent tickets found")
@@ -42,19 +45,9 @@ def get_pixel_tickets():
             summary = ticket['fields']['summary']
             description = ticket['fields'].get('description', '')
 
-            # Extract description text
-            desc_text = ""
-            if isinstance(description, dict) and 'content' in description:
-                for content in description['content']:
-                    if content.get('type') == 'paragraph' and 'content' in content:
-                        for text_content in content['content']:
-                            if text_content.get('type') == 'text':
-                                desc_text += text_content.get('text', '') + " "
-            else:
-                desc_text = str(description) if description else ""
-
-            # Use existing pixel detection
-            if is_pixel_related_ticket(summary, desc_text):
+            # Use existing pixel detection; it flattens rich text descriptions itself
+            is_pixel_related, reason = is_pixel_related_ticket(summary, description)
+            if is_pixel_related:
                 pixel_tickets.append(ticket)
 
         logger.info(f"🎯 Found {len(pixel_tickets)} pixel-related tickets")
@@ -9,6 +9,9 @@ import os
 sys.path.append('core')
 sys.path.append('dashboard')
 
+# Status checks look back further than the monitor's short polling window
+STATUS_LOOKBACK_MINUTES = 6 * 60
+
 def main():
     """Main interface for pixel monitoring system"""
 
@@ -61,7 +64,7 @@ def run_status_check():
         print("🔍 Running pixel monitoring status check...")
 
         # Get recent tickets
-        recent_tickets = search_recent_tickets()
+        recent_tickets = search_recent_tickets(STATUS_LOOKBACK_MINUTES)
         if recent_tickets is None:
             print("❌ Failed to connect to Jira API")
             return
@@ -74,18 +77,8 @@ def run_status_check():
             summary = ticket['fields']['summary']
             description = ticket['fields'].get('description', '')
 
-            # Handle rich text description
-            desc_text = ""
-            if isinstance(description, dict) and 'content' in description:
-                for content in description['content']:
-                    if content.get('type') == 'paragraph' and 'content' in content:
-                        for text_content in content['content']:
-                            if text_content.get('type') == 'text':
-                                desc_text += text_content.get('text', '') + " "
-            else:
-                desc_text = str(description) if description else ""
-
-            is_pixel_related, reason = is_pixel_related_ticket(summary, desc_text)
+            # Rich text descriptions are flattened by the detector itself
+            is_pixel_related, reason = is_pixel_related_ticket(summary, description)
             if is_pixel_related:
                 pixel_tickets.append(ticket)
 
@@ -141,7 +134,7 @@ def test_system():
         print("🧪 Testing system connectivity...")
 
         # Test Jira connection
-        tickets = search_recent_tickets()
+        tickets = search_recent_tickets(STATUS_LOOKBACK_MINUTES)
         if tickets is not None:
             print(f"✅ Jira API connection: Working ({len(tickets)} tickets)")
         else:
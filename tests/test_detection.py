@@ -0,0 +1,78 @@
+"""Tests for the pixel ticket detection logic in core/pixel_notification_monitor.py"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'core'))
+
+from pixel_notification_monitor import (
+    DETECTION_SCANNER,
+    DETECTION_TEST_CASES,
+    EXCLUSION_KEYWORDS,
+    build_candidate_jql,
+    build_keyword_scanner,
+    build_recent_tickets_query,
+    is_pixel_related_ticket,
+    jql_phrase,
+    scan_keywords,
+)
+
+
+@pytest.mark.parametrize('summary,expected', DETECTION_TEST_CASES)
+def test_known_ticket_summaries(summary, expected):
+    assert is_pixel_related_ticket(summary)[0] == expected
+
+
+def test_empty_summary_is_not_pixel_related():
+    assert is_pixel_related_ticket('') == (False, 'no_summary')
+
+
+def test_description_decides_when_summary_has_no_match():
+    description = {'type': 'doc', 'content': [
+        {'type': 'paragraph', 'content': [{'type': 'text', 'text': 'Please install the tracking tag'}]}
+    ]}
+
+    assert is_pixel_related_ticket('Need help') == (False, 'no_match')
+    assert is_pixel_related_ticket('Need help', description) == (True, 'medium:tracking_action')
+
+
+def test_summary_exclusion_wins_over_description():
+    assert is_pixel_related_ticket('ACR pixel', 'pixel firing on the website')[1] == 'excluded:acr'
+
+
+def test_scanner_reports_overlapping_prefixes():
+    scanner = build_keyword_scanner(['pixel', 'pixel firing', 'tag'])
+
+    assert scan_keywords(scanner, 'PIXEL FIRING on stage') == {'pixel', 'pixel firing', 'tag'}
+    assert scan_keywords(scanner, 'nothing here') == set()
+
+
+@pytest.mark.parametrize('text', [
+    'Conversion pixel not firing on the confirmation page',
+    'ACR delivery report; user sync pixels; o&o monitoring',
+    'tagging javascript setup for the website',
+    '',
+])
+def test_scanner_matches_substring_search(text):
+    lowered = text.lower()
+    words = set(DETECTION_SCANNER[1])
+    assert scan_keywords(DETECTION_SCANNER, text) == {word for word in words if word in lowered}
+
+
+def test_jql_phrase_escapes_reserved_characters():
+    assert jql_phrase('pixel') == '\\"pixel\\"'
+    assert jql_phrase('o&o monitoring') == '\\"o\\\\&o monitoring\\"'
+
+
+def test_candidate_jql_excludes_every_exclusion_keyword():
+    jql = build_candidate_jql()
+
+    assert jql.startswith('text ~ "')
+    for keyword in EXCLUSION_KEYWORDS:
+        assert f'summary !~ "{jql_phrase(keyword)}"' in jql
+
+
+def test_recent_tickets_query_uses_relative_lookback():
+    assert 'created >= -90m' in build_recent_tickets_query(90)['jql']